@@ -4,7 +4,7 @@ description: A unified pipe to generate images using various fal.ai models. Requ
 author: Alex Rzem
 version: 0.2.0
 license: MIT
-requirements: fal-client, python-dotenv, requests
+requirements: fal-client, python-dotenv, aiohttp, orjson
 environment_variables: FAL_KEY
 
 PROMPT TAG SYNTAX:
@@ -35,198 +35,320 @@ Notes:
 - Not all tags are supported by all models (check parse_tags config)
 """
 
-import os
-import re
 import asyncio
-import json
-import requests
-from typing import List, Callable, Awaitable, AsyncGenerator
+import functools
+import logging
+import random
+import aiohttp
+import orjson
+from typing import List, Callable, Awaitable, AsyncGenerator, NamedTuple
 from pydantic import BaseModel, Field
 import fal_client
 
-MODELS = [
-    {
-        "id": "falai-flux-1-dev",
-        "name": "Flux.1 [dev]",
-        "path": "fal-ai/flux-1/dev",
-        "schema_input": "https://fal.ai/models/fal-ai/flux-1/dev/api#schema-input",
-        "schema_output": "https://fal.ai/models/fal-ai/flux-1/dev/api#schema-output",
-        "parse_tags": [
-            {"tag": "ar", "parameter": "image_size"},
-            {"tag": "steps", "parameter": "num_inference_steps"},
-            {"tag": "seed", "parameter": "seed"},
-            {"tag": "guide", "parameter": "guidance_scale"},
-            {"tag": "repeat", "parameter": "num_images"},
-            {"tag": "safe", "parameter": "enable_safety_checker"},
-            {"tag": "format", "parameter": "output_format"},
-            {"tag": "speed", "parameter": "acceleration"},
-        ],
-    },
-    {
-        "id": "falai-flux-kontext-dev",
-        "name": "Flux.1 Kontext [dev]",
-        "path": "fal-ai/flux-kontext/dev",
-        "schema_input": "https://fal.ai/models/fal-ai/flux-kontext/dev/api#schema-input",
-        "schema_output": "https://fal.ai/models/fal-ai/flux-kontext/dev/api#schema-output",
-        "parse_tags": [
-            {"tag": "ar", "parameter": "image_size"},
-            {"tag": "steps", "parameter": "num_inference_steps"},
-            {"tag": "seed", "parameter": "seed"},
-            {"tag": "guide", "parameter": "guidance_scale"},
-            {"tag": "repeat", "parameter": "num_images"},
-            {"tag": "safe", "parameter": "enable_safety_checker"},
-            {"tag": "format", "parameter": "output_format"},
-            {"tag": "speed", "parameter": "acceleration"},
-            {"tag": "enhance", "parameter": "enhance_prompt"},
-        ],
-    },
-    {
-        "id": "falai-flux-pro",
-        "name": "Flux.1 [pro]",
-        "path": "fal-ai/flux-pro/v1.1",
-        "schema_input": "https://fal.ai/models/fal-ai/flux-pro/v1.1/api#schema-input",
-        "schema_output": "https://fal.ai/models/fal-ai/flux-pro/v1.1/api#schema-output",
-        "parse_tags": [
-            {"tag": "ar", "parameter": "image_size"},
-            {"tag": "steps", "parameter": "num_inference_steps"},
-            {"tag": "seed", "parameter": "seed"},
-            {"tag": "guide", "parameter": "guidance_scale"},
-            {"tag": "repeat", "parameter": "num_images"},
-            {"tag": "safe", "parameter": "enable_safety_checker"},
-            {"tag": "format", "parameter": "output_format"},
-            {"tag": "speed", "parameter": "acceleration"},
-        ],
-    },
-    {
-        "id": "falai-flux-pro-kontext",
-        "name": "Flux.1 Kontext [pro]",
-        "path": "fal-ai/flux-pro/kontext",
-        "schema_input": "https://fal.ai/models/fal-ai/flux-pro/kontext/api#schema-input",
-        "schema_output": "ttps://fal.ai/models/fal-ai/flux-pro/kontext/api#schema-output",
-        "parse_tags": [
-            {"tag": "ar", "parameter": "image_size"},
-            {"tag": "steps", "parameter": "num_inference_steps"},
-            {"tag": "seed", "parameter": "seed"},
-            {"tag": "guide", "parameter": "guidance_scale"},
-            {"tag": "repeat", "parameter": "num_images"},
-            {"tag": "safe", "parameter": "enable_safety_checker"},
-            {"tag": "format", "parameter": "output_format"},
-            {"tag": "speed", "parameter": "acceleration"},
-        ],
-    },
-    {
-        "id": "falai-flux-2",
-        "name": "Flux.2 [dev]",
-        "path": "fal-ai/flux-2",
-        "schema_input": "https://fal.ai/models/fal-ai/flux-2/api#schema-input",
-        "schema_output": "https://fal.ai/models/fal-ai/flux-2/api#schema-output",
-        "parse_tags": [
-            {"tag": "ar", "parameter": "image_size"},
-            {"tag": "steps", "parameter": "num_inference_steps"},
-            {"tag": "seed", "parameter": "seed"},
-            {"tag": "guide", "parameter": "guidance_scale"},
-            {"tag": "repeat", "parameter": "num_images"},
-            {"tag": "safe", "parameter": "enable_safety_checker"},
-            {"tag": "format", "parameter": "output_format"},
-            {"tag": "speed", "parameter": "acceleration"},
-        ],
-    },
-    {
-        "id": "falai-flux-2-flex",
-        "name": "Flux.2 [flex]",
-        "path": "fal-ai/flux-2-flex",
-        "schema_input": "https://fal.ai/models/fal-ai/flux-2-flex/api#schema-input",
-        "schema_output": "https://fal.ai/models/fal-ai/flux-2-flex/api#schema-output",
-        "parse_tags": [
-            {"tag": "ar", "parameter": "image_size"},
-            {"tag": "steps", "parameter": "num_inference_steps"},
-            {"tag": "seed", "parameter": "seed"},
-            {"tag": "guide", "parameter": "guidance_scale"},
-            {"tag": "repeat", "parameter": "num_images"},
-            {"tag": "safe", "parameter": "enable_safety_checker"},
-            {"tag": "format", "parameter": "output_format"},
-            {"tag": "speed", "parameter": "acceleration"},
-        ],
-    },
-    {
-        "id": "falai-flux-2-pro",
-        "name": "Flux.2 [pro]",
-        "path": "fal-ai/flux-2-pro",
-        "schema_input": "https://fal.ai/models/fal-ai/flux-2-pro/api#schema-input",
-        "schema_output": "https://fal.ai/models/fal-ai/flux-2-pro/api#schema-output",
-        "parse_tags": [
-            {"tag": "ar", "parameter": "image_size"},
-            {"tag": "steps", "parameter": "num_inference_steps"},
-            {"tag": "seed", "parameter": "seed"},
-            {"tag": "guide", "parameter": "guidance_scale"},
-            {"tag": "repeat", "parameter": "num_images"},
-            {"tag": "safe", "parameter": "enable_safety_checker"},
-            {"tag": "format", "parameter": "output_format"},
-            {"tag": "speed", "parameter": "acceleration"},
-        ],
-    },
-    {
-        "id": "falai-flux-2-klein-4b",
-        "name": "Flux.2 [klein] - 4b",
-        "path": "fal-ai/flux-2/klein/4b",
-        "schema_input": "https://fal.ai/models/fal-ai/flux-2/klein/4b/api#schema-input",
-        "schema_output": "https://fal.ai/models/fal-ai/flux-2/klein/4b/api#schema-output",
-        "parse_tags": [
-            {"tag": "ar", "parameter": "image_size"},
-            {"tag": "steps", "parameter": "num_inference_steps"},
-            {"tag": "seed", "parameter": "seed"},
-            {"tag": "guide", "parameter": "guidance_scale"},
-            {"tag": "repeat", "parameter": "num_images"},
-            {"tag": "safe", "parameter": "enable_safety_checker"},
-            {"tag": "format", "parameter": "output_format"},
-            {"tag": "speed", "parameter": "acceleration"},
-        ],
-    },
-    {
-        "id": "falai-nano-banana-pro",
-        "name": "NanoBanana [pro]",
-        "path": "fal-ai/nano-banana-pro",
-        "schema_input": "https://fal.ai/models/fal-ai/nano-banana-pro/api#schema-input",
-        "schema_output": "https://fal.ai/models/fal-ai/nano-banana-pro/api#schema-output",
-        "parse_tags": [
-            {"tag": "ar", "parameter": "image_size"},
-            {"tag": "steps", "parameter": "num_inference_steps"},
-            {"tag": "seed", "parameter": "seed"},
-            {"tag": "guide", "parameter": "guidance_scale"},
-            {"tag": "repeat", "parameter": "num_images"},
-            {"tag": "safe", "parameter": "enable_safety_checker"},
-            {"tag": "format", "parameter": "output_format"},
-            {"tag": "speed", "parameter": "acceleration"},
-        ],
-    },
-    {
-        "id": "falai-z-image-turbo",
-        "name": "Z-Image [turbo]",
-        "path": "fal-ai/z-image/turbo",
-        "schema_input": "https://fal.ai/models/fal-ai/z-image/turbo/api#schema-input",
-        "schema_output": "https://fal.ai/models/fal-ai/z-image/turbo/api#schema-output",
-        "parse_tags": [
-            {"tag": "ar", "parameter": "image_size"},
-            {"tag": "steps", "parameter": "num_inference_steps"},
-            {"tag": "seed", "parameter": "seed"},
-            {"tag": "guide", "parameter": "guidance_scale"},
-            {"tag": "repeat", "parameter": "num_images"},
-            {"tag": "safe", "parameter": "enable_safety_checker"},
-            {"tag": "format", "parameter": "output_format"},
-            {"tag": "speed", "parameter": "acceleration"},
-        ],
-    },
-]
-
-
-def parse_prompt_tags(prompt: str, model_config: dict, valves) -> tuple:
+log = logging.getLogger(__name__)
+
+# Tags returned when OpenRouter tag generation is unavailable or fails
+_TAG_FALLBACK = '{"tags": ["Image Generation", "Art"]}'
+
+# Upper bound on the requests a single --repeat fans out to; each one is billed.
+# They all run at once, so this also bounds concurrent fal.ai requests per prompt.
+MAX_FANOUT_IMAGES = 4
+
+
+class Model(NamedTuple):
+    """A fal.ai model exposed by the pipe."""
+
+    id: str
+    name: str
+    path: str
+    schema_input: str
+    schema_output: str
+    # (tag, parameter) pairs for prompt tags supported by the model
+    parse_tags: tuple[tuple[str, str], ...]
+    # False for models without a num_images input; --repeat is fanned out instead
+    native_num_images: bool = True
+    # Size input: "image_size" (WIDTH/HEIGHT valves) or "aspect_ratio" (ASPECT_RATIO)
+    size_parameter: str = "image_size"
+
+
+# Prompt tags shared by most models
+_STANDARD_TAGS = (
+    ("ar", "image_size"),
+    ("steps", "num_inference_steps"),
+    ("seed", "seed"),
+    ("guide", "guidance_scale"),
+    ("repeat", "num_images"),
+    ("safe", "enable_safety_checker"),
+    ("format", "output_format"),
+    ("speed", "acceleration"),
+)
+_KONTEXT_DEV_TAGS = _STANDARD_TAGS + (("enhance", "enhance_prompt"),)
+
+MODELS = (
+    Model(
+        "falai-flux-1-dev",
+        "Flux.1 [dev]",
+        path="fal-ai/flux-1/dev",
+        schema_input="https://fal.ai/models/fal-ai/flux-1/dev/api#schema-input",
+        schema_output="https://fal.ai/models/fal-ai/flux-1/dev/api#schema-output",
+        parse_tags=_STANDARD_TAGS,
+    ),
+    Model(
+        "falai-flux-kontext-dev",
+        "Flux.1 Kontext [dev]",
+        path="fal-ai/flux-kontext/dev",
+        schema_input="https://fal.ai/models/fal-ai/flux-kontext/dev/api#schema-input",
+        schema_output="https://fal.ai/models/fal-ai/flux-kontext/dev/api#schema-output",
+        parse_tags=_KONTEXT_DEV_TAGS,
+    ),
+    Model(
+        "falai-flux-pro",
+        "Flux.1 [pro]",
+        path="fal-ai/flux-pro/v1.1",
+        schema_input="https://fal.ai/models/fal-ai/flux-pro/v1.1/api#schema-input",
+        schema_output="https://fal.ai/models/fal-ai/flux-pro/v1.1/api#schema-output",
+        parse_tags=_STANDARD_TAGS,
+    ),
+    Model(
+        "falai-flux-pro-kontext",
+        "Flux.1 Kontext [pro]",
+        path="fal-ai/flux-pro/kontext",
+        schema_input="https://fal.ai/models/fal-ai/flux-pro/kontext/api#schema-input",
+        schema_output="ttps://fal.ai/models/fal-ai/flux-pro/kontext/api#schema-output",
+        parse_tags=_STANDARD_TAGS,
+    ),
+    Model(
+        "falai-flux-2",
+        "Flux.2 [dev]",
+        path="fal-ai/flux-2",
+        schema_input="https://fal.ai/models/fal-ai/flux-2/api#schema-input",
+        schema_output="https://fal.ai/models/fal-ai/flux-2/api#schema-output",
+        parse_tags=_STANDARD_TAGS,
+    ),
+    Model(
+        "falai-flux-2-flex",
+        "Flux.2 [flex]",
+        path="fal-ai/flux-2-flex",
+        schema_input="https://fal.ai/models/fal-ai/flux-2-flex/api#schema-input",
+        schema_output="https://fal.ai/models/fal-ai/flux-2-flex/api#schema-output",
+        parse_tags=_STANDARD_TAGS,
+    ),
+    Model(
+        "falai-flux-2-pro",
+        "Flux.2 [pro]",
+        path="fal-ai/flux-2-pro",
+        schema_input="https://fal.ai/models/fal-ai/flux-2-pro/api#schema-input",
+        schema_output="https://fal.ai/models/fal-ai/flux-2-pro/api#schema-output",
+        parse_tags=_STANDARD_TAGS,
+        native_num_images=False,
+    ),
+    Model(
+        "falai-flux-2-klein-4b",
+        "Flux.2 [klein] - 4b",
+        path="fal-ai/flux-2/klein/4b",
+        schema_input="https://fal.ai/models/fal-ai/flux-2/klein/4b/api#schema-input",
+        schema_output="https://fal.ai/models/fal-ai/flux-2/klein/4b/api#schema-output",
+        parse_tags=_STANDARD_TAGS,
+    ),
+    Model(
+        "falai-nano-banana-pro",
+        "NanoBanana [pro]",
+        path="fal-ai/nano-banana-pro",
+        schema_input="https://fal.ai/models/fal-ai/nano-banana-pro/api#schema-input",
+        schema_output="https://fal.ai/models/fal-ai/nano-banana-pro/api#schema-output",
+        parse_tags=_STANDARD_TAGS,
+        size_parameter="aspect_ratio",
+    ),
+    Model(
+        "falai-z-image-turbo",
+        "Z-Image [turbo]",
+        path="fal-ai/z-image/turbo",
+        schema_input="https://fal.ai/models/fal-ai/z-image/turbo/api#schema-input",
+        schema_output="https://fal.ai/models/fal-ai/z-image/turbo/api#schema-output",
+        parse_tags=_STANDARD_TAGS,
+    ),
+)
+
+# Lookup tables derived once from MODELS
+_TAG_MAP_BY_PATH = {m.path: dict(m.parse_tags) for m in MODELS}
+_MODELS_BY_ID = {m.id: m for m in MODELS}
+_PIPES_LIST = [{"id": m.id, "name": m.name} for m in MODELS]
+
+# API parameters by value type, for prompt tag conversion
+_BOOL_PARAMS = frozenset({"enable_safety_checker", "enhance_prompt"})
+_TRUE = frozenset({"true", "1", "yes"})
+_FALSE = frozenset({"false", "0", "no"})
+# Numeric parameters -> (converter, type name for error messages)
+_CONVERTERS = {
+    "num_inference_steps": (int, "integer"),
+    "num_images": (int, "integer"),
+    "seed": (int, "integer"),
+    "guidance_scale": (float, "float"),
+}
+
+
+# Character classes and states for the prompt tag scanner
+_C_OTHER, _C_SPACE, _C_WORD, _C_DASH, _C_EMDASH = range(5)
+_S_TEXT, _S_DASH1, _S_TAG, _S_VALUE, _S_VALUE_DASH1 = range(5)
+
+# Character class of each ASCII character, indexed by code point
+_ASCII_CLASS = bytes(
+    _C_DASH
+    if c == "-"
+    else _C_SPACE
+    if c.isspace()
+    else _C_WORD
+    if c.isalnum() or c == "_"
+    else _C_OTHER
+    for c in map(chr, range(128))
+)
+
+
+def _char_class(ch: str) -> int:
+    """Return the scanner character class of a single character."""
+    code = ord(ch)
+    if code < 128:
+        return _ASCII_CLASS[code]
+    if ch == "—":
+        return _C_EMDASH
+    if ch.isspace():
+        return _C_SPACE
+    if ch.isalnum():
+        return _C_WORD
+    return _C_OTHER
+
+
+def _scan_tags(prompt: str, parts: list):
+    """
+    Scan a prompt for tags in a single left-to-right pass.
+
+    A tag is "--" or "—" at the start of the prompt or after whitespace, followed by
+    a word (the tag name) and then whitespace or the end of the prompt. Its value is
+    everything up to the next whitespace-preceded delimiter or the end of the prompt.
+
+    The scan is a small state machine over a character class table, so it runs in
+    linear time regardless of the prompt contents. Plain text between possible
+    delimiters is skipped with str.find rather than stepped through per character.
+
+    Args:
+        prompt: User prompt potentially containing tags like "--steps 24 --ar 9:16"
+        parts: List that receives the words of the prompt outside of any tag
+
+    Yields:
+        tuple: (tag_name, tag_value) where tag_value is None for flag-only tags
+    """
+    state = _S_TEXT
+    boundary = True  # Previous character is whitespace, or start of prompt
+    text_start = 0  # Start of text not yet added to parts
+    tag_start = 0  # Position of the current tag's delimiter
+    name_start = name_end = 0
+    value_start = -1  # First non-space character of the value, -1 if none yet
+    dash_pos = 0  # Position of a possible "--" delimiter inside a value
+    next_dash = next_em = -1  # Cached positions of the next "-" and "—"
+    n = len(prompt)
+    i = 0
+
+    while i < n:
+        if state == _S_TEXT or (state == _S_VALUE and value_start >= 0):
+            # Only a delimiter can change state here, so jump straight to the next one
+            if next_dash < i:
+                next_dash = prompt.find("-", i)
+                if next_dash < 0:
+                    next_dash = n
+            if next_em < i:
+                next_em = prompt.find("—", i)
+                if next_em < 0:
+                    next_em = n
+            j = min(next_dash, next_em)
+            if j == n:
+                break
+            if j > i:
+                boundary = _char_class(prompt[j - 1]) == _C_SPACE
+                i = j
+
+        cls = _char_class(prompt[i])
+
+        if state == _S_TEXT:
+            if boundary and cls == _C_DASH:
+                state = _S_DASH1
+                tag_start = i
+            elif boundary and cls == _C_EMDASH:
+                state = _S_TAG
+                tag_start = i
+                name_start = i + 1
+
+        elif state == _S_DASH1:
+            if cls == _C_DASH:
+                state = _S_TAG
+                name_start = i + 1
+            else:
+                state = _S_TEXT
+
+        elif state == _S_TAG:
+            if cls == _C_SPACE and i > name_start:
+                state = _S_VALUE
+                name_end = i
+                value_start = -1
+            elif cls != _C_WORD:
+                # Not a tag after all; its delimiter stays part of the text
+                state = _S_TEXT
+
+        elif state == _S_VALUE:
+            if boundary and cls == _C_EMDASH:
+                parts.extend(prompt[text_start:tag_start].split())
+                yield prompt[name_start:name_end], (
+                    prompt[value_start:i].rstrip() if value_start >= 0 else None
+                )
+                state = _S_TAG
+                text_start = tag_start = i
+                name_start = i + 1
+            elif boundary and cls == _C_DASH:
+                state = _S_VALUE_DASH1
+                dash_pos = i
+            elif value_start < 0 and cls != _C_SPACE:
+                value_start = i
+
+        elif state == _S_VALUE_DASH1:
+            if cls == _C_DASH:
+                parts.extend(prompt[text_start:tag_start].split())
+                yield prompt[name_start:name_end], (
+                    prompt[value_start:dash_pos].rstrip() if value_start >= 0 else None
+                )
+                state = _S_TAG
+                text_start = tag_start = dash_pos
+                name_start = i + 1
+            else:
+                # A single dash is part of the value
+                state = _S_VALUE
+                if value_start < 0:
+                    value_start = dash_pos
+
+        boundary = cls == _C_SPACE
+        i += 1
+
+    if state == _S_VALUE_DASH1 and value_start < 0:
+        value_start = dash_pos
+
+    if state == _S_TAG and n > name_start:
+        parts.extend(prompt[text_start:tag_start].split())
+        yield prompt[name_start:], None
+    elif state in (_S_VALUE, _S_VALUE_DASH1):
+        parts.extend(prompt[text_start:tag_start].split())
+        yield prompt[name_start:name_end], (
+            prompt[value_start:].rstrip() if value_start >= 0 else None
+        )
+    else:
+        parts.extend(prompt[text_start:].split())
+
+
+def parse_prompt_tags(prompt: str, model_config: Model, base_size: tuple) -> tuple:
     """
     Parse command-line style tags from prompt and return cleaned prompt with overrides.
 
     Args:
         prompt: User prompt potentially containing tags like "--steps 24 --ar 9:16"
-        model_config: Model dictionary from MODELS array with parse_tags field
-        valves: Pipe valves for accessing WIDTH/HEIGHT for aspect ratio calculations
+        model_config: Model record from MODELS with parse_tags field
+        base_size: (width, height) from the valves, for aspect ratio calculations
 
     Returns:
         tuple: (cleaned_prompt, overrides_dict)
@@ -234,32 +356,25 @@ def parse_prompt_tags(prompt: str, model_config: dict, valves) -> tuple:
             - overrides_dict: Dictionary of parameter overrides, may contain "_warnings" list
 
     Example:
-        >>> parse_prompt_tags("dog --steps 24 --ar 16:9", model_config, valves)
-        ("dog", {"num_inference_steps": 24, "image_size": {"width": 1422, "height": 800}})
+        >>> parse_prompt_tags("dog --steps 24 --ar 16:9", model_config, (800, 1422))
+        ("dog", {"num_inference_steps": 24, "image_size": {"width": 2528, "height": 1422}})
     """
     overrides = {}
     warnings = []
-    cleaned_prompt = prompt
 
-    # Get parse_tags configuration for this model
-    parse_tags_config = model_config.get("parse_tags", [])
-    if not parse_tags_config:
+    # Get the tag -> parameter mapping for this model
+    tag_map = _TAG_MAP_BY_PATH.get(model_config.path, {})
+    if not tag_map:
         return prompt, overrides
 
-    # Build a mapping of tag -> parameter name
-    tag_map = {item["tag"]: item["parameter"] for item in parse_tags_config}
-
-    # Pattern to match tags: --tagname or —tagname or --tagname value or —tagname value
-    # This regex captures: (?:--|—)(\w+)(?:\s+([^\s\-—][^\-—]*?))?(?=\s+(?:--|—)|$)
-    # Matches "--steps 24", "—steps 24", "--safe", "—safe", "--ar 16:9", "—ar 16:9", etc.
-    tag_pattern = r"(?:--|—)(\w+)(?:\s+([^\s\-—][^\-—]*?))?(?=\s+(?:--|—)|$)"
-
-    matches = list(re.finditer(tag_pattern, prompt))
+    # Fast path: most prompts contain no tag delimiter at all
+    if "--" not in prompt and "—" not in prompt:
+        return prompt, overrides
 
-    for match in matches:
-        tag_name = match.group(1)
-        tag_value = match.group(2)
+    # Words outside of tags, collected by the scanner as it goes
+    parts = []
 
+    for tag_name, tag_value in _scan_tags(prompt, parts):
         # Check if tag is valid for this model
         if tag_name not in tag_map:
             warnings.append(f"Unknown tag --{tag_name} ignored")
@@ -270,17 +385,19 @@ def parse_prompt_tags(prompt: str, model_config: dict, valves) -> tuple:
         # Convert value based on parameter type
         try:
             converted_value = _convert_tag_value(
-                tag_name, tag_value, parameter_name, valves
+                tag_name, tag_value, parameter_name, base_size
             )
             overrides[parameter_name] = converted_value
         except ValueError as e:
             warnings.append(str(e))
             continue
 
-    # Remove all tags from the prompt
-    cleaned_prompt = re.sub(tag_pattern, "", prompt)
-    # Clean up extra whitespace
-    cleaned_prompt = re.sub(r"\s+", " ", cleaned_prompt).strip()
+    # Delimiters without any tag (e.g. "well--known"): keep the prompt as typed
+    if not overrides and not warnings:
+        return prompt, overrides
+
+    # Rebuild the prompt without tags, with whitespace collapsed
+    cleaned_prompt = " ".join(parts)
 
     if warnings:
         overrides["_warnings"] = warnings
@@ -289,16 +406,17 @@ def parse_prompt_tags(prompt: str, model_config: dict, valves) -> tuple:
 
 
 def _convert_tag_value(
-    tag_name: str, tag_value: str | None, parameter_name: str, valves
+    tag_name: str, tag_value: str | None, parameter_name: str, base_size: tuple
 ):
     """
     Convert a tag value string to the appropriate type based on parameter name.
 
     Args:
         tag_name: Original tag name (e.g., "steps", "ar")
-        tag_value: String value from prompt or None for flag-only tags
+        tag_value: String value from prompt or None for flag-only tags. The
+            scanner trims leading and trailing whitespace, so it is not stripped here
         parameter_name: API parameter name (e.g., "num_inference_steps", "image_size")
-        valves: Pipe valves for WIDTH/HEIGHT access
+        base_size: (width, height) of the valve defaults, for aspect ratio tags
 
     Returns:
         Converted value in appropriate type
@@ -307,14 +425,14 @@ def _convert_tag_value(
         ValueError: If conversion fails or value is invalid
     """
     # Handle boolean parameters (flags)
-    if parameter_name in ["enable_safety_checker", "enhance_prompt"]:
+    if parameter_name in _BOOL_PARAMS:
         if tag_value is None:
             return True
 
-        tag_value_lower = tag_value.strip().lower()
-        if tag_value_lower in ["true", "1", "yes"]:
+        tag_value_lower = tag_value.lower()
+        if tag_value_lower in _TRUE:
             return True
-        elif tag_value_lower in ["false", "0", "no"]:
+        elif tag_value_lower in _FALSE:
             return False
         else:
             raise ValueError(
@@ -325,44 +443,38 @@ def _convert_tag_value(
     if tag_value is None:
         raise ValueError(f"Tag --{tag_name} requires a value, skipping")
 
-    tag_value = tag_value.strip()
-
     # Handle aspect ratio -> image_size conversion
     if parameter_name == "image_size":
-        return _convert_aspect_ratio(tag_value, tag_name, valves)
-
-    # Handle integer parameters
-    if parameter_name in ["num_inference_steps", "num_images", "seed"]:
-        try:
-            return int(tag_value)
-        except ValueError:
-            raise ValueError(
-                f"Invalid integer value '{tag_value}' for --{tag_name}, skipping"
-            )
-
-    # Handle float parameters
-    if parameter_name == "guidance_scale":
-        try:
-            return float(tag_value)
-        except ValueError:
-            raise ValueError(
-                f"Invalid float value '{tag_value}' for --{tag_name}, skipping"
-            )
-
-    # Handle string parameters (output_format, acceleration, etc.)
-    return tag_value
+        return _convert_aspect_ratio(tag_value, tag_name, *base_size)
+
+    # Handle numeric parameters
+    converter = _CONVERTERS.get(parameter_name)
+    if converter is None:
+        # Handle string parameters (output_format, acceleration, etc.)
+        return tag_value
+
+    convert, type_name = converter
+    try:
+        return convert(tag_value)
+    except ValueError:
+        raise ValueError(
+            f"Invalid {type_name} value '{tag_value}' for --{tag_name}, skipping"
+        )
 
 
-def _convert_aspect_ratio(ratio_str: str, tag_name: str, valves) -> dict:
+def _convert_aspect_ratio(
+    ratio_str: str, tag_name: str, base_width: int, base_height: int
+) -> dict:
     """
     Convert aspect ratio string like "16:9" to image_size dict.
 
     Uses valve WIDTH and HEIGHT as base dimensions, adjusting one to match ratio.
 
     Args:
-        ratio_str: Aspect ratio string like "16:9", "9:16", "1:1"
+        ratio_str: Aspect ratio string like "16:9", "9:16", "1:1", already trimmed
         tag_name: Original tag name for error messages
-        valves: Pipe valves containing WIDTH and HEIGHT
+        base_width: Valve WIDTH
+        base_height: Valve HEIGHT
 
     Returns:
         dict: {"width": int, "height": int}
@@ -371,24 +483,36 @@ def _convert_aspect_ratio(ratio_str: str, tag_name: str, valves) -> dict:
         ValueError: If ratio format is invalid
     """
     # Parse ratio like "16:9" or "9:16"
-    match = re.match(r"^(\d+):(\d+)$", ratio_str.strip())
-    if not match:
+    width_part, _, height_part = ratio_str.partition(":")
+    if not (width_part.isdecimal() and height_part.isdecimal()):
         raise ValueError(
             f"Invalid aspect ratio '{ratio_str}' for --{tag_name}, expected format like '16:9', skipping"
         )
 
-    width_ratio = int(match.group(1))
-    height_ratio = int(match.group(2))
+    width_ratio = int(width_part)
+    height_ratio = int(height_part)
 
     if width_ratio <= 0 or height_ratio <= 0:
         raise ValueError(
             f"Invalid aspect ratio '{ratio_str}' for --{tag_name}, skipping"
         )
 
-    # Get base dimensions from valves
-    base_width = valves.WIDTH
-    base_height = valves.HEIGHT
+    final_width, final_height = _aspect_ratio_size(
+        width_ratio, height_ratio, base_width, base_height
+    )
+    return {"width": final_width, "height": final_height}
+
 
+@functools.lru_cache(maxsize=128)
+def _aspect_ratio_size(
+    width_ratio: int, height_ratio: int, base_width: int, base_height: int
+) -> tuple:
+    """
+    Compute (width, height) for a ratio from base dimensions, memoized.
+
+    Returns:
+        tuple: (width, height) with one base dimension adjusted to match the ratio
+    """
     # Calculate dimensions preserving the requested ratio
     # If width_ratio > height_ratio, we have a landscape/wider aspect
     # If height_ratio > width_ratio, we have a portrait/taller aspect
@@ -405,7 +529,30 @@ def _convert_aspect_ratio(ratio_str: str, tag_name: str, valves) -> dict:
         final_width = base_width
         final_height = int(base_width / ratio_value)
 
-    return {"width": final_width, "height": final_height}
+    return final_width, final_height
+
+
+def _extract_last_user_text(messages: List[dict]) -> str:
+    """
+    Return the text of the last user message.
+
+    Args:
+        messages: Chat messages from the request body
+
+    Returns:
+        str: Message text (text parts joined for multi-part content), or "" if none
+    """
+    for msg in reversed(messages):
+        if msg.get("role") == "user":
+            content = msg.get("content")
+            if isinstance(content, list):
+                return " ".join(
+                    p.get("text", "") for p in content if p.get("type") == "text"
+                ).strip()
+            elif isinstance(content, str):
+                return content
+            break
+    return ""
 
 
 class Pipe:
@@ -423,6 +570,15 @@ class Pipe:
         ENABLE_SAFETY_CHECKER: bool = Field(
             default=False, description="Enable Safety Checker"
         )
+        TIMEOUT_S: int = Field(
+            default=300,
+            gt=0,
+            description=(
+                "Seconds to wait for each generation request before cancelling it. "
+                f"A --repeat batch sends its requests (at most {MAX_FANOUT_IMAGES}) "
+                "in parallel, each with this limit"
+            ),
+        )
 
         # OpenRouter configuration for tag generation
         OPENROUTER_API_KEY: str = Field(
@@ -433,18 +589,62 @@ class Pipe:
             description="Model to use for tag generation via OpenRouter"
         )
 
+    # Fixed instance layout; Open WebUI only ever replaces `valves`
+    __slots__ = (
+        "type",
+        "id",
+        "name",
+        "description",
+        "valves",
+        "_fal",
+        "_aiohttp",
+    )
+
     def __init__(self):
         self.type = "manifold"
         self.id = "openwebui_function_fal_ai"
         self.name = "Fal.ai Image Generator"
         self.description = "A unified pipe to generate images using various Fal.ai models. Requires explicit model selection."
         self.valves = self.Valves()
-        self.emitter: Callable[[dict], Awaitable[None]] | None = None
-
-    async def emit_status(self, message: str = "", done: bool = False):
-        if self.emitter:
+        # fal.ai client for the current FAL_KEY valve, created on first use
+        self._fal: fal_client.AsyncClient | None = None
+        # Keep-alive HTTP session for OpenRouter calls, created on first use
+        self._aiohttp: aiohttp.ClientSession | None = None
+
+    def get_fal_client(self) -> fal_client.AsyncClient:
+        """Return the fal.ai client, recreating it if the FAL_KEY valve changed."""
+        if self._fal is None or self._fal.key != self.valves.FAL_KEY:
+            # The old client is not closed: requests still in flight (other chats,
+            # batch siblings) poll through its pool until they finish
+            self._fal = fal_client.AsyncClient(key=self.valves.FAL_KEY)
+        return self._fal
+
+    def get_http_session(self) -> aiohttp.ClientSession:
+        """Return the shared aiohttp session, creating it if needed."""
+        if self._aiohttp is None or self._aiohttp.closed:
+            self._aiohttp = aiohttp.ClientSession()
+        return self._aiohttp
+
+    async def on_shutdown(self):
+        """Close the shared aiohttp session and drop the fal.ai client."""
+        # fal_client offers no public close for AsyncClient; its pool is released
+        # once the client is garbage collected
+        self._fal = None
+
+        if self._aiohttp is not None and not self._aiohttp.closed:
+            await self._aiohttp.close()
+        self._aiohttp = None
+
+    async def emit_status(
+        self,
+        emitter: Callable[[dict], Awaitable[None]] | None,
+        message: str = "",
+        done: bool = False,
+    ):
+        # The emitter belongs to one request; the Pipe instance is shared by all of them
+        if emitter:
             try:
-                await self.emitter(
+                await emitter(
                     {
                         "type": "status",
                         "data": {
@@ -453,7 +653,8 @@ class Pipe:
                         },
                     }
                 )
-            except Exception:
+            except (RuntimeError, ConnectionError):
+                # Status updates are best-effort; a closed socket must not fail the request
                 pass
 
     def is_tag_generation_request(self, user_message: str) -> bool:
@@ -469,28 +670,26 @@ class Pipe:
         if not user_message:
             return False
 
-        message_lower = user_message.lower()
-
-        # Check for tag generation indicators
-        has_task_generate = "### task: generate" in message_lower
-        has_tags_keyword = "tags" in message_lower
-        has_tags_json = '"tags":' in user_message
-        has_categorizing = "categorizing the main themes" in message_lower
+        # Cheapest, most selective check first: exact match, no allocation
+        if '"tags":' in user_message:
+            log.debug("[Tag Detection] Has '\"tags\":' JSON")
+            return True
 
-        # Debug logging
-        print(f"[Tag Detection] Checking message for tag generation patterns...")
-        print(f"[Tag Detection] Has '### Task: Generate': {has_task_generate}")
-        print(f"[Tag Detection] Has 'tags' keyword: {has_tags_keyword}")
-        print(f"[Tag Detection] Has '\"tags\":' JSON: {has_tags_json}")
-        print(f"[Tag Detection] Has 'categorizing the main themes': {has_categorizing}")
+        # One lowercased copy for the case-insensitive checks; plain substring
+        # search on it is cheaper than IGNORECASE regex scans
+        message_lower = user_message.lower()
+        if "### task: generate" in message_lower and "tags" in message_lower:
+            log.debug("[Tag Detection] Has '### Task: Generate' and 'tags' keyword")
+            return True
 
-        # Return True if message contains tag generation indicators
-        is_tag_request = (has_task_generate and has_tags_keyword) or has_tags_json or has_categorizing
-        print(f"[Tag Detection] Is tag generation request: {is_tag_request}")
+        if "categorizing the main themes" in message_lower:
+            log.debug("[Tag Detection] Has 'categorizing the main themes'")
+            return True
 
-        return is_tag_request
+        log.debug("[Tag Detection] Is tag generation request: False")
+        return False
 
-    def generate_tags_with_openrouter(self, messages: List[dict]) -> str:
+    async def generate_tags_with_openrouter(self, messages: List[dict]) -> str:
         """
         Generate tags using OpenRouter's Qwen model.
 
@@ -500,11 +699,11 @@ class Pipe:
         Returns:
             str: JSON string with generated tags
         """
-        print("[OpenRouter] Starting tag generation...")
+        log.debug("[OpenRouter] Starting tag generation...")
 
         if not self.valves.OPENROUTER_API_KEY:
-            print("[OpenRouter] Error: OPENROUTER_API_KEY not set")
-            return '{"tags": ["Image Generation", "Art"]}'
+            log.warning("[OpenRouter] Error: OPENROUTER_API_KEY not set")
+            return _TAG_FALLBACK
 
         try:
             url = "https://openrouter.ai/api/v1/chat/completions"
@@ -523,187 +722,270 @@ class Pipe:
                 "max_tokens": 200
             }
 
-            print(f"[OpenRouter] Calling API with model: {self.valves.TAG_MODEL}")
-            print(f"[OpenRouter] Payload: {json.dumps(payload, indent=2)}")
-
-            response = requests.post(url, headers=headers, json=payload, timeout=30)
-            response.raise_for_status()
+            log.debug("[OpenRouter] Calling API with model: %s", self.valves.TAG_MODEL)
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(
+                    "[OpenRouter] Payload: %s",
+                    orjson.dumps(payload, option=orjson.OPT_INDENT_2).decode(),
+                )
 
-            result = response.json()
-            print(f"[OpenRouter] Response: {json.dumps(result, indent=2)}")
+            async with self.get_http_session().post(
+                url,
+                headers=headers,
+                data=orjson.dumps(payload),
+                timeout=aiohttp.ClientTimeout(total=30),
+            ) as response:
+                response.raise_for_status()
+                result = orjson.loads(await response.read())
+            if log.isEnabledFor(logging.DEBUG):
+                log.debug(
+                    "[OpenRouter] Response: %s",
+                    orjson.dumps(result, option=orjson.OPT_INDENT_2).decode(),
+                )
 
             # Extract content from response
             if "choices" in result and len(result["choices"]) > 0:
                 content = result["choices"][0].get("message", {}).get("content", "")
-                print(f"[OpenRouter] Generated content: {content}")
+                log.debug("[OpenRouter] Generated content: %s", content)
                 return content
             else:
-                print("[OpenRouter] No choices in response, using fallback")
-                return '{"tags": ["Image Generation", "Art"]}'
-
-        except requests.exceptions.Timeout:
-            print("[OpenRouter] Request timeout, using fallback")
-            return '{"tags": ["Image Generation", "Art"]}'
-        except requests.exceptions.RequestException as e:
-            print(f"[OpenRouter] Request error: {e}, using fallback")
-            return '{"tags": ["Image Generation", "Art"]}'
-        except Exception as e:
-            print(f"[OpenRouter] Unexpected error: {e}, using fallback")
-            return '{"tags": ["Image Generation", "Art"]}'
+                log.warning("[OpenRouter] No choices in response, using fallback")
+                return _TAG_FALLBACK
+
+        except asyncio.TimeoutError:
+            log.warning("[OpenRouter] Request timeout, using fallback")
+            return _TAG_FALLBACK
+        except aiohttp.ClientError as e:
+            log.warning("[OpenRouter] Request error: %s, using fallback", e)
+            return _TAG_FALLBACK
+        except (orjson.JSONDecodeError, KeyError, TypeError, AttributeError) as e:
+            log.warning("[OpenRouter] Malformed response: %s, using fallback", e)
+            return _TAG_FALLBACK
+
+    async def generate(
+        self,
+        api_model_id: str,
+        arguments: dict,
+        emitter: Callable[[dict], Awaitable[None]] | None = None,
+        report_progress: bool = True,
+    ) -> dict:
+        """
+        Submit a single generation request to fal.ai and wait for its result.
+
+        Args:
+            api_model_id: fal.ai model path (e.g., "fal-ai/flux-2")
+            arguments: Model input arguments
+            emitter: Event emitter of the request, for status updates
+            report_progress: Emit queue position and progress status updates
+
+        Returns:
+            dict: fal.ai result payload
+        """
+        handler = await self.get_fal_client().submit(
+            api_model_id, arguments=arguments
+        )
+
+        async def wait_for_result() -> dict:
+            if report_progress:
+                # Report queue position and progress while the request is pending
+                last_message = None
+                async for event in handler.iter_events(with_logs=False):
+                    if isinstance(event, fal_client.Queued):
+                        message = f"Queued for {api_model_id} (position {event.position})..."
+                    elif isinstance(event, fal_client.InProgress):
+                        message = f"Generating image with {api_model_id}..."
+                    else:
+                        break
+                    if message != last_message:
+                        await self.emit_status(emitter, message, done=False)
+                        last_message = message
+
+            return await handler.get()
+
+        try:
+            return await asyncio.wait_for(wait_for_result(), timeout=self.valves.TIMEOUT_S)
+        except (asyncio.TimeoutError, asyncio.CancelledError):
+            # Stop the request on fal.ai's side too, so it does not keep running
+            try:
+                await handler.cancel()
+            except Exception as e:
+                log.warning("[Fal.ai] Failed to cancel request %s: %s", handler.request_id, e)
+            raise
+
+    async def generate_batch(
+        self,
+        api_model_id: str,
+        arguments: dict,
+        num_images: int,
+        emitter: Callable[[dict], Awaitable[None]] | None = None,
+    ) -> dict:
+        """
+        Generate several images as concurrent single-image requests.
+
+        Used for models that do not accept num_images. Each request gets its own
+        seed: consecutive seeds from a --seed tag, otherwise random ones.
+
+        Args:
+            api_model_id: fal.ai model path (e.g., "fal-ai/flux-2-pro")
+            arguments: Model input arguments, including num_images
+            num_images: Number of images to generate
+            emitter: Event emitter of the request, for status updates
+
+        Returns:
+            dict: Result payload with the images of all requests merged
+        """
+        arguments = {k: v for k, v in arguments.items() if k != "num_images"}
+        base_seed = arguments.get("seed")
+
+        async def generate_one(index: int) -> dict:
+            seed = (
+                base_seed + index
+                if base_seed is not None
+                else random.randint(0, 2**31 - 1)
+            )
+            return await self.generate(
+                api_model_id,
+                {**arguments, "seed": seed},
+                emitter,
+                report_progress=index == 0,
+            )
+
+        tasks = [asyncio.ensure_future(generate_one(i)) for i in range(num_images)]
+        try:
+            results = await asyncio.gather(*tasks)
+        finally:
+            # One failed request must not leave its billed siblings running
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        return {
+            "images": [
+                image for result in results if result for image in result.get("images", [])
+            ]
+        }
 
     def pipes(self) -> List[dict]:
-        return [{"id": model["id"], "name": model["name"]} for model in MODELS]
+        return _PIPES_LIST
 
     async def pipe(
         self,
         body: dict,
         __event_emitter__: Callable[[dict], Awaitable[None]] = None,
     ) -> AsyncGenerator[str, None]:
-        self.emitter = __event_emitter__
+        # Bound per request: concurrent chats share this Pipe instance
+        emitter = __event_emitter__
 
-        # 0. Check if this is a tag generation request
+        # Read valves once; each attribute access goes through pydantic
+        valves = self.valves
+        fal_key = valves.FAL_KEY
+        width, height = valves.WIDTH, valves.HEIGHT
+
+        # Get the last user message once; it is both the tag check input and the prompt
         messages = body.get("messages", [])
-        if messages:
-            # Get the last user message
-            last_user_message = ""
-            for msg in reversed(messages):
-                if msg.get("role") == "user":
-                    content = msg.get("content")
-                    if isinstance(content, list):
-                        text_parts = [
-                            p.get("text", "") for p in content if p.get("type") == "text"
-                        ]
-                        last_user_message = " ".join(text_parts).strip()
-                    elif isinstance(content, str):
-                        last_user_message = content
-                    break
-
-            # Check if this is a tag generation request
-            if self.is_tag_generation_request(last_user_message):
-                print("[Pipe] Detected tag generation request, routing to OpenRouter...")
-                await self.emit_status("Generating tags with OpenRouter...", done=False)
-
-                # Generate tags using OpenRouter
-                tags_result = self.generate_tags_with_openrouter(messages)
-
-                await self.emit_status("Tag generation complete", done=True)
-                yield tags_result
+        prompt = _extract_last_user_text(messages)
+
+        # 0. Check if this is a tag generation request
+        if self.is_tag_generation_request(prompt):
+            log.debug("[Pipe] Detected tag generation request, routing to OpenRouter...")
+            await self.emit_status(emitter, "Generating tags with OpenRouter...", done=False)
+
+            # Generate tags using OpenRouter
+            try:
+                tags_result = await self.generate_tags_with_openrouter(messages)
+            except Exception as e:
+                await self.emit_status(emitter, f"Error: {e}", done=True)
+                yield f"Error: {e}"
                 return
 
+            await self.emit_status(emitter, "Tag generation complete", done=True)
+            yield tags_result
+            return
+
         # 1. Determine Model ID
         request_model_id = body.get("model", "")
 
-        # Map internal IDs to Fal API IDs from global MODELS
-        model_map = {model["id"]: model["path"] for model in MODELS}
-
-        api_model_id = None
-
-        # Check for known models
-        for internal_id, external_id in model_map.items():
-            if internal_id in request_model_id:
-                api_model_id = external_id
-                break
+        # Manifold ids arrive as "<pipe id>.<model id>"; a bare model id also works
+        _, _, model_id = request_model_id.rpartition(".")
+        model_config = _MODELS_BY_ID.get(model_id)
 
         # If no match found, return ERROR immediately
-        if not api_model_id:
+        if not model_config:
             yield f"**Error:** The selected model (`{request_model_id}`) is not supported by the Fal.ai Master Pipe.\n\nPlease select one of the **IMG:** models from the dropdown list."
             return
 
-        # 2. Get Prompt
-        messages = body.get("messages", [])
+        api_model_id = model_config.path
+
+        # 2. Check Prompt
         if not messages:
             yield "Error: No messages found."
             return
 
-        prompt = ""
-        for msg in reversed(messages):
-            if msg.get("role") == "user":
-                content = msg.get("content")
-                if isinstance(content, list):
-                    text_parts = [
-                        p.get("text", "") for p in content if p.get("type") == "text"
-                    ]
-                    prompt = " ".join(text_parts).strip()
-                elif isinstance(content, str):
-                    prompt = content
-                break
-
         if not prompt:
             yield "Error: No prompt found."
             return
 
         # 2.5. Parse Prompt Tags
-        # Find model config from MODELS array
-        model_config = None
-        for model in MODELS:
-            if model["path"] == api_model_id:
-                model_config = model
-                break
-
-        # Parse tags if model config found
-        cleaned_prompt = prompt
-        tag_overrides = {}
-
-        if model_config:
-            cleaned_prompt, tag_overrides = parse_prompt_tags(
-                prompt, model_config, self.valves
-            )
+        cleaned_prompt, tag_overrides = parse_prompt_tags(
+            prompt, model_config, (width, height)
+        )
 
-            # Emit warnings if any
-            if "_warnings" in tag_overrides:
-                for warning in tag_overrides["_warnings"]:
-                    await self.emit_status(f"Warning: {warning}", done=False)
-                del tag_overrides["_warnings"]
-        else:
-            # Log if we couldn't find model config for tag parsing
-            await self.emit_status(
-                f"Note: Tag parsing not available for model {api_model_id}", done=False
+        # Emit warnings if any
+        await asyncio.gather(
+            *(
+                self.emit_status(emitter, f"Warning: {warning}", done=False)
+                for warning in tag_overrides.pop("_warnings", ())
             )
+        )
 
-        # 3. Setup Env
-        if not self.valves.FAL_KEY:
+        # 3. Check API Key
+        if not fal_key:
             yield "Error: FAL_KEY not set in valves."
             return
-        os.environ["FAL_KEY"] = self.valves.FAL_KEY
 
         # 4. Construct Arguments
-        # Start with valve defaults
+        # Valve defaults, then tag overrides (tags take precedence over valves)
         arguments = {
             "prompt": cleaned_prompt,  # Use cleaned prompt with tags removed
-            "enable_safety_checker": self.valves.ENABLE_SAFETY_CHECKER,
+            "enable_safety_checker": valves.ENABLE_SAFETY_CHECKER,
+            **tag_overrides,
         }
 
-        # Logic Branches based on selected model
-        if "imagen4" in api_model_id:
-            arguments["aspect_ratio"] = self.valves.ASPECT_RATIO
-        elif "nano-banana" in api_model_id:
-            arguments["aspect_ratio"] = self.valves.ASPECT_RATIO
-        else:
-            # Fallback for known models that might not have a specific block above
-            arguments["image_size"] = {
-                "width": self.valves.WIDTH,
-                "height": self.valves.HEIGHT,
-            }
-
-        # Apply tag overrides (tags take precedence over valves)
-        arguments.update(tag_overrides)
+        # Size default from valves, unless a tag (e.g. --ar) already set it
+        size_parameter = model_config.size_parameter
+        if size_parameter not in arguments:
+            if size_parameter == "aspect_ratio":
+                arguments[size_parameter] = valves.ASPECT_RATIO
+            else:
+                arguments[size_parameter] = {"width": width, "height": height}
 
         # 5. Call API
-        await self.emit_status(f"Generating image with {api_model_id}...", done=False)
+        await self.emit_status(emitter, f"Generating image with {api_model_id}...", done=False)
 
         try:
-            loop = asyncio.get_running_loop()
-
-            def run_fal_generation():
-                return fal_client.submit(api_model_id, arguments=arguments).get()
-
-            result = await loop.run_in_executor(None, run_fal_generation)
+            num_requested = arguments.get("num_images", 1)
+            if num_requested > 1 and not model_config.native_num_images:
+                # Each fanned-out image is a separate paid request, so cap them
+                if num_requested > MAX_FANOUT_IMAGES:
+                    await self.emit_status(
+                        emitter,
+                        f"Warning: {model_config.name} generates at most "
+                        f"{MAX_FANOUT_IMAGES} images per prompt; generating {MAX_FANOUT_IMAGES}",
+                        done=False,
+                    )
+                    num_requested = MAX_FANOUT_IMAGES
+                result = await self.generate_batch(
+                    api_model_id, arguments, num_requested, emitter
+                )
+            else:
+                result = await self.generate(api_model_id, arguments, emitter)
 
             if result and "images" in result and len(result["images"]) > 0:
                 images = result["images"]
                 num_images = len(images)
 
                 await self.emit_status(
+                    emitter,
                     f"Generated {num_images} image{'s' if num_images > 1 else ''} successfully",
                     done=True,
                 )
@@ -711,16 +993,21 @@ class Pipe:
                 # Display all generated images
                 for idx, image in enumerate(images, 1):
                     image_url = image.get("url", "")
-                    if image_url:
-                        if num_images > 1:
-                            yield f"**Image {idx}/{num_images}**\n\n"
-                        yield f"![Generated Image]({image_url})\n\n"
-                    else:
+                    if not image_url:
                         yield f"Warning: Image {idx} URL missing\n\n"
+                        continue
+
+                    # One chunk per image; the header only matters for batches
+                    header = f"**Image {idx}/{num_images}**\n\n" if num_images > 1 else ""
+                    yield f"{header}![Generated Image]({image_url})\n\n"
             else:
-                await self.emit_status("Generation failed", done=True)
+                await self.emit_status(emitter, "Generation failed", done=True)
                 yield f"Error: Generation failed. Result: {result}"
 
+        except asyncio.TimeoutError:
+            await self.emit_status(emitter, "Generation timed out", done=True)
+            yield f"Error: Generation timed out after {valves.TIMEOUT_S} seconds."
+
         except Exception as e:
-            await self.emit_status(f"Error: {e}", done=True)
+            await self.emit_status(emitter, f"Error: {e}", done=True)
             yield f"Error: {e}"
@@ -9,29 +9,196 @@ Environment Variables Required:
 - OPENWEBUI_URL: The base URL of your OpenWebUI instance (e.g., https://openwebui.example.com)
 - OPENWEBUI_API_KEY: Your OpenWebUI API key
 
+Optional Environment Variables:
+- DEPLOY_CONCURRENCY: Number of functions deployed in parallel (default: 10)
+- DEPLOY_FORCE: Set to 1 to redeploy files that are unchanged since the last deploy
+- DEPLOY_VERBOSE: Set to 0 to omit per-file progress lines from the log (default: 1)
+
 Usage:
     python deploy.py
 """
 
 import os
 import sys
+import ast
+import functools
 import json
-import requests
+import hashlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
 import re
 
+# requests (and urllib3) load on first use, so early exits skip their import cost
+if TYPE_CHECKING:
+    import requests
+
+# orjson is optional: it speeds up encoding the large function source payloads
+try:
+    import orjson
+
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+except ImportError:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj).encode('utf-8')
+
+    _json_loads = json.loads
+
+# Write buffer for the deployment log file
+LOG_BUFFER_SIZE = 128 * 1024
+# Separator line before the deployment summary
+_SEP = '=' * 50
+
+# Rate limiting (HTTP 429): how often to retry a write, and the longest wait honored
+MAX_RATE_LIMIT_RETRIES = 3
+MAX_RETRY_AFTER = 60
+
+# Class names OpenWebUI loads a function from, preferred over other classes in the file
+ENTRY_CLASSES = ('Pipe', 'Filter', 'Action', 'Tools')
+
+# OpenWebUI IDs allow only alphanumeric characters and underscores
+_RE_ID_SANITIZE = re.compile(r'[^a-zA-Z0-9_]')
+
+
+@functools.cache
+def _requests():
+    """Import and return the requests module; called before any HTTP work."""
+    import requests
+    return requests
+
+
+@functools.cache
+def _capped_retry():
+    """Return a urllib3 Retry subclass that waits at most MAX_RETRY_AFTER per Retry-After."""
+    from urllib3.util.retry import Retry
+
+    class CappedRetry(Retry):
+        def get_retry_after(self, response) -> Optional[float]:
+            retry_after = super().get_retry_after(response)
+            return None if retry_after is None else min(retry_after, MAX_RETRY_AFTER)
+
+    return CappedRetry
+
+
+def _retry_after(response: 'requests.Response') -> float:
+    """Seconds to wait before retrying a rate-limited request."""
+    try:
+        # Retry-After may also be an HTTP date; fall back to a short wait then
+        return min(max(float(response.headers.get('Retry-After', '1')), 0), MAX_RETRY_AFTER)
+    except ValueError:
+        return 1.0
+
+
+def _string_attributes(class_node: ast.ClassDef) -> Dict[str, str]:
+    """
+    Collect the string-literal attributes of a class.
+
+    Covers class-level assignments (`id = "..."`) and assignments in
+    `__init__` (`self.id = "..."`); the latter take precedence.
+
+    Args:
+        class_node: Parsed class definition
+
+    Returns:
+        Dictionary mapping attribute names to their string values
+    """
+    attributes = {}
+    init_body = []
+
+    for stmt in class_node.body:
+        if isinstance(stmt, ast.FunctionDef) and stmt.name == '__init__':
+            init_body = stmt.body
+        elif (
+            isinstance(stmt, ast.Assign)
+            and len(stmt.targets) == 1
+            and isinstance(stmt.targets[0], ast.Name)
+            and isinstance(stmt.value, ast.Constant)
+            and isinstance(stmt.value.value, str)
+        ):
+            attributes[stmt.targets[0].id] = stmt.value.value
+
+    for stmt in init_body:
+        if (
+            isinstance(stmt, ast.Assign)
+            and len(stmt.targets) == 1
+            and isinstance(stmt.targets[0], ast.Attribute)
+            and isinstance(stmt.targets[0].value, ast.Name)
+            and stmt.targets[0].value.id == 'self'
+            and isinstance(stmt.value, ast.Constant)
+            and isinstance(stmt.value.value, str)
+        ):
+            attributes[stmt.targets[0].attr] = stmt.value.value
+
+    return attributes
+
+
+def _iter_function_files(root: Path) -> Iterator[Path]:
+    """
+    Yield the function files under a directory tree.
+
+    Uses os.scandir, whose entries carry their type from the directory read,
+    so only matching files are turned into Path objects.
+
+    Args:
+        root: Directory to search
+
+    Yields:
+        Paths of .py files, excluding dunder files like __init__.py
+    """
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith('.py') and not entry.name.startswith('__') and entry.is_file():
+                    yield Path(entry.path)
+
+
+def _function_hash(function: Dict) -> Optional[str]:
+    """
+    Hash a function's name, description and source, so local files can be
+    compared with deployed ones.
+
+    Args:
+        function: Local function metadata, or a function record from the server
+
+    Returns:
+        Hex digest, or None if the record has no content
+    """
+    content = function.get('content')
+    if not isinstance(content, str):
+        return None
+    # OpenWebUI keeps the description in meta; older payloads sent it top-level
+    meta = function.get('meta') or {}
+    description = meta.get('description') or function.get('description') or ''
+    fingerprint = _json_dumps([function.get('name') or '', description, content])
+    return hashlib.sha256(fingerprint).hexdigest()
+
 
 class OpenWebUIDeployer:
     """Handles deployment of functions to OpenWebUI."""
 
-    def __init__(self, base_url: str, api_key: str):
+    def __init__(
+        self,
+        base_url: str,
+        api_key: str,
+        max_workers: int = 10,
+        force: bool = False,
+        verbose: bool = True
+    ):
         """
         Initialize the deployer.
 
         Args:
             base_url: Base URL of OpenWebUI instance
             api_key: API key for authentication
+            max_workers: Number of functions deployed in parallel
+            force: Deploy every file, even if unchanged since the last deploy
+            verbose: Log per-file progress, not just outcomes and the summary
         """
         self.base_url = base_url.rstrip('/')
         self.api_key = api_key
@@ -39,19 +206,123 @@ class OpenWebUIDeployer:
             'Authorization': f'Bearer {api_key}',
             'Content-Type': 'application/json'
         }
+        self.max_workers = max(1, max_workers)
+        # Reading and parsing files is local work, sized to the machine instead
+        self.read_workers = (os.cpu_count() or 1) * 2
+        self.force = force
+        self.verbose = verbose
+
+        from requests.adapters import HTTPAdapter
+        Retry = _capped_retry()
+
+        # One keep-alive session for all API calls, with a connection per worker.
+        # Retries cover connection errors, and rate limits and gateway errors on
+        # idempotent requests (writes handle rate limits in post()). Retry-After
+        # waits are capped like those in post().
+        self.session = _requests().Session()
+        self.session.headers.update(self.headers)
+        adapter = HTTPAdapter(
+            pool_maxsize=self.max_workers,
+            max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=[429, 502, 503, 504])
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.log_file = 'deployment-log.txt'
-        self.logs = []
+        # Log lines are streamed to the file through a large buffer instead of kept in memory
+        self._log_fp = open(self.log_file, 'w', encoding='utf-8', buffering=LOG_BUFFER_SIZE)
+        # Functions are deployed from worker threads, which all log
+        self._log_lock = threading.Lock()
+
+        # Files deployed by earlier runs, per OpenWebUI instance
+        self.cache_file = '.deploy-cache.json'
+        self._cache_data = self.load_cache()
+        self._cache = self._cache_data.setdefault(self.base_url, {})
+        self._cache_lock = threading.Lock()
+
+        # Writes retried after a rate limit, reported in the deployment stats
+        self.retried = 0
+        self._retried_lock = threading.Lock()
 
     def log(self, message: str, level: str = 'INFO'):
         """Log a message to console and log file."""
-        log_entry = f'[{level}] {message}'
-        print(log_entry)
-        self.logs.append(log_entry)
+        log_entry = f'[{level}] {message}\n'
+        with self._log_lock:
+            print(log_entry, end='')
+            if not self._log_fp.closed:
+                self._log_fp.write(log_entry)
 
     def save_logs(self):
-        """Save logs to file."""
-        with open(self.log_file, 'w') as f:
-            f.write('\n'.join(self.logs))
+        """Flush and close the log file."""
+        with self._log_lock:
+            self._log_fp.close()
+
+    def load_cache(self) -> Dict:
+        """Load the deploy cache, or start an empty one if it is missing or unreadable."""
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def save_cache(self):
+        """Save the deploy cache atomically, so an interrupted write never corrupts it."""
+        tmp_file = f'{self.cache_file}.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(self._cache_data, f, indent=2)
+        os.replace(tmp_file, self.cache_file)
+
+    def is_unchanged(self, file_path: Path, existing_functions: Dict[str, Optional[str]]) -> bool:
+        """
+        Check whether a file is identical to the one deployed by an earlier run,
+        and the server still has that deployment.
+
+        Args:
+            file_path: Path to the Python function file
+            existing_functions: Dictionary of existing function IDs and function hashes
+
+        Returns:
+            True if the file was deployed before and neither it nor the server copy has changed since
+        """
+        entry = self._cache.get(str(file_path))
+        if self.force or not entry:
+            return False
+
+        # Deleted on the server, or edited there since (when its hash is known)
+        if entry.get('id') not in existing_functions:
+            return False
+        remote_hash = existing_functions[entry['id']]
+        if remote_hash is not None and remote_hash != entry.get('hash'):
+            return False
+
+        # Same mtime: unchanged without reading the file
+        mtime = file_path.stat().st_mtime_ns
+        if entry.get('mtime') == mtime:
+            return True
+
+        # Touched but identical content (e.g. a fresh checkout): remember the new mtime
+        if entry.get('sha256') == hashlib.sha256(file_path.read_bytes()).hexdigest():
+            entry['mtime'] = mtime
+            return True
+
+        return False
+
+    def remember(self, file_path: Path, metadata: Dict):
+        """
+        Record a successfully deployed file in the deploy cache.
+
+        Args:
+            file_path: Path to the Python function file
+            metadata: Function metadata and content the file was deployed as
+        """
+        entry = {
+            'mtime': file_path.stat().st_mtime_ns,
+            'sha256': hashlib.sha256(file_path.read_bytes()).hexdigest(),
+            'id': metadata['id'],
+            'hash': _function_hash(metadata)
+        }
+        with self._cache_lock:
+            self._cache[str(file_path)] = entry
 
     def extract_function_metadata(self, file_path: Path) -> Optional[Dict]:
         """
@@ -64,38 +335,31 @@ class OpenWebUIDeployer:
             Dictionary with function metadata or None if extraction fails
         """
         try:
-            with open(file_path, 'r') as f:
-                content = f.read()
+            content = file_path.read_text(encoding='utf-8')
+            tree = ast.parse(content, filename=str(file_path))
 
-            # Extract class name (usually the main class in the file)
-            class_match = re.search(r'class\s+(\w+)(?:\([^)]*\))?:', content)
-            if not class_match:
+            # Find the main class: the one OpenWebUI loads, else the first one
+            classes = [node for node in tree.body if isinstance(node, ast.ClassDef)]
+            if not classes:
                 self.log(f'Could not find class definition in {file_path.name}', 'WARNING')
                 return None
 
-            class_name = class_match.group(1)
+            main_class = next((c for c in classes if c.name in ENTRY_CLASSES), classes[0])
+            class_name = main_class.name
 
-            # Try to extract metadata from class attributes
-            # Look for id/name attributes in the class
-            id_match = re.search(r'id\s*=\s*["\']([^"\']+)["\']', content)
-            name_match = re.search(r'name\s*=\s*["\']([^"\']+)["\']', content)
-            description_match = re.search(r'description\s*=\s*["\']([^"\']+)["\']', content)
+            # Extract metadata from the class's id/name/description attributes
+            attributes = _string_attributes(main_class)
 
             # Generate ID from filename if not found
             # OpenWebUI only allows alphanumeric characters and underscores
-            if id_match:
-                function_id = id_match.group(1)
-            else:
-                # Convert filename to valid ID
-                function_id = file_path.stem
+            function_id = attributes.get('id') or file_path.stem
 
-            # Sanitize the ID: replace hyphens with underscores
-            # and remove any other non-alphanumeric characters except underscores
-            function_id = function_id.replace('-', '_')
-            function_id = re.sub(r'[^a-zA-Z0-9_]', '_', function_id)
+            # Sanitize the ID: replace hyphens and any other
+            # non-alphanumeric characters except underscores with underscores
+            function_id = _RE_ID_SANITIZE.sub('_', function_id)
 
-            function_name = name_match.group(1) if name_match else class_name
-            function_description = description_match.group(1) if description_match else f'Function from {file_path.name}'
+            function_name = attributes.get('name') or class_name
+            function_description = attributes.get('description') or f'Function from {file_path.name}'
 
             return {
                 'id': function_id,
@@ -103,6 +367,7 @@ class OpenWebUIDeployer:
                 'description': function_description,
                 'content': content,
                 'meta': {
+                    'description': function_description,
                     'manifest': {}
                 }
             }
@@ -111,28 +376,79 @@ class OpenWebUIDeployer:
             self.log(f'Error extracting metadata from {file_path.name}: {str(e)}', 'ERROR')
             return None
 
-    def get_existing_functions(self) -> Dict[str, str]:
+    def post(self, url: str, payload: Dict, timeout: int = 30) -> 'requests.Response':
+        """
+        POST a JSON payload, waiting out rate limits (HTTP 429) as the server asks.
+
+        A rate-limited request was rejected without being processed, so unlike
+        other failed writes it is safe to send again.
+
+        Args:
+            url: Full endpoint URL
+            payload: JSON-serializable request body
+            timeout: Request timeout in seconds
+
+        Returns:
+            The final response, which may still be a 429 once retries run out
+        """
+        data = _json_dumps(payload)
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            response = self.session.post(url, data=data, timeout=timeout)
+            if response.status_code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                return response
+
+            delay = _retry_after(response)
+            self.log(f'Rate limited, retrying in {delay:g}s...', 'WARNING')
+            with self._retried_lock:
+                self.retried += 1
+            time.sleep(delay)
+
+    def get_existing_functions(self) -> Dict[str, Optional[str]]:
         """
         Get list of existing functions from OpenWebUI.
 
         Returns:
-            Dictionary mapping function IDs to their internal IDs
+            Dictionary mapping function IDs to a hash of their deployed name,
+            description and content, or None where the content is unknown
         """
         try:
-            response = requests.get(
+            response = self.session.get(
                 f'{self.base_url}/api/v1/functions/',
-                headers=self.headers,
                 timeout=30
             )
             response.raise_for_status()
 
-            functions = response.json()
-            return {func.get('id'): func.get('id') for func in functions}
+            functions = _json_loads(response.content)
 
-        except requests.exceptions.RequestException as e:
+        except (_requests().exceptions.RequestException, ValueError) as e:
             self.log(f'Error fetching existing functions: {str(e)}', 'ERROR')
             return {}
 
+        # The list omits function source; the export endpoint includes it
+        if functions and not any('content' in func for func in functions):
+            functions = self.get_exported_functions() or functions
+
+        return {func.get('id'): _function_hash(func) for func in functions}
+
+    def get_exported_functions(self) -> Optional[List[Dict]]:
+        """
+        Get all functions from OpenWebUI including their content.
+
+        Returns:
+            List of functions, or None if the export fails
+        """
+        try:
+            response = self.session.get(
+                f'{self.base_url}/api/v1/functions/export',
+                timeout=60
+            )
+            response.raise_for_status()
+            return _json_loads(response.content)
+
+        except (_requests().exceptions.RequestException, ValueError) as e:
+            self.log(f'Could not export functions, unchanged ones will be redeployed: {str(e)}', 'WARNING')
+            return None
+
     def create_function(self, function_data: Dict) -> bool:
         """
         Create a new function in OpenWebUI.
@@ -144,17 +460,12 @@ class OpenWebUIDeployer:
             True if successful, False otherwise
         """
         try:
-            response = requests.post(
-                f'{self.base_url}/api/v1/functions/create',
-                headers=self.headers,
-                json=function_data,
-                timeout=30
-            )
+            response = self.post(f'{self.base_url}/api/v1/functions/create', function_data)
             response.raise_for_status()
             self.log(f'Successfully created function: {function_data["id"]}', 'SUCCESS')
             return True
 
-        except requests.exceptions.RequestException as e:
+        except _requests().exceptions.RequestException as e:
             self.log(f'Error creating function {function_data["id"]}: {str(e)}', 'ERROR')
             if hasattr(e.response, 'text'):
                 self.log(f'Response: {e.response.text}', 'ERROR')
@@ -172,48 +483,111 @@ class OpenWebUIDeployer:
             True if successful, False otherwise
         """
         try:
-            response = requests.post(
-                f'{self.base_url}/api/v1/functions/id/{function_id}/update',
-                headers=self.headers,
-                json=function_data,
-                timeout=30
-            )
+            response = self.post(f'{self.base_url}/api/v1/functions/id/{function_id}/update', function_data)
             response.raise_for_status()
             self.log(f'Successfully updated function: {function_id}', 'SUCCESS')
             return True
 
-        except requests.exceptions.RequestException as e:
+        except _requests().exceptions.RequestException as e:
             self.log(f'Error updating function {function_id}: {str(e)}', 'ERROR')
             if hasattr(e.response, 'text'):
                 self.log(f'Response: {e.response.text}', 'ERROR')
             return False
 
-    def deploy_function(self, file_path: Path, existing_functions: Dict[str, str]) -> bool:
+    def deploy_each(self, python_files: List[Path], existing_functions: Dict[str, Optional[str]]) -> Iterator[str]:
         """
-        Deploy a single function file to OpenWebUI.
+        Deploy functions one by one, in parallel on thread pools.
+
+        Files are read and parsed on one pool, and uploaded on another as soon
+        as each is parsed, so disk reads overlap with HTTP round-trips.
+
+        Args:
+            python_files: Paths to the Python function files
+            existing_functions: Dictionary of existing function IDs and function hashes
+
+        Yields:
+            Status per function file ('success', 'skipped' or 'failed'), in completion order
+        """
+        # existing_functions is only read from here on, so it is shared as-is
+        with ThreadPoolExecutor(max_workers=self.read_workers) as read_pool, \
+                ThreadPoolExecutor(max_workers=self.max_workers) as upload_pool:
+            prepared = {
+                read_pool.submit(self._prepare, file_path): file_path
+                for file_path in python_files
+            }
+
+            uploads = {}
+            for future in as_completed(prepared):
+                file_path = prepared[future]
+                try:
+                    metadata = future.result()
+                except Exception as e:
+                    self.log(f'Error reading {file_path.name}: {str(e)}', 'ERROR')
+                    metadata = None
+
+                if not metadata:
+                    yield 'failed'
+                    continue
+
+                upload = upload_pool.submit(self._upload, file_path, metadata, existing_functions)
+                uploads[upload] = file_path
+
+            for future in as_completed(uploads):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    self.log(f'Error deploying {uploads[future].name}: {str(e)}', 'ERROR')
+                    yield 'failed'
+
+    def is_deployed(self, file_path: Path, metadata: Dict, existing_functions: Dict[str, Optional[str]]) -> bool:
+        """
+        Check whether the server already has exactly this function name,
+        description and content.
 
         Args:
             file_path: Path to the Python function file
-            existing_functions: Dictionary of existing function IDs
+            metadata: Extracted function metadata and content
+            existing_functions: Dictionary of existing function IDs and function hashes
 
         Returns:
-            True if successful, False otherwise
+            True if the deployed function matches the local file
         """
-        self.log(f'Processing {file_path.name}...')
-
-        metadata = self.extract_function_metadata(file_path)
-        if not metadata:
+        remote_hash = existing_functions.get(metadata['id'])
+        if self.force or remote_hash is None or remote_hash != _function_hash(metadata):
             return False
 
+        if self.verbose:
+            self.log(f'Function {metadata["id"]} unchanged on server, skipping')
+        self.remember(file_path, metadata)
+        return True
+
+    def _prepare(self, file_path: Path) -> Optional[Dict]:
+        """Read a function file and extract its metadata (disk and CPU only)."""
+        if self.verbose:
+            self.log(f'Processing {file_path.name}...')
+        return self.extract_function_metadata(file_path)
+
+    def _upload(self, file_path: Path, metadata: Dict, existing_functions: Dict[str, Optional[str]]) -> str:
+        """Create or update a function from its extracted metadata (HTTP only)."""
+        if self.is_deployed(file_path, metadata, existing_functions):
+            return 'skipped'
+
         function_id = metadata['id']
 
         # Check if function exists
         if function_id in existing_functions:
-            self.log(f'Function {function_id} exists, updating...')
-            return self.update_function(function_id, metadata)
+            if self.verbose:
+                self.log(f'Function {function_id} exists, updating...')
+            deployed = self.update_function(function_id, metadata)
         else:
-            self.log(f'Function {function_id} does not exist, creating...')
-            return self.create_function(metadata)
+            if self.verbose:
+                self.log(f'Function {function_id} does not exist, creating...')
+            deployed = self.create_function(metadata)
+
+        if deployed:
+            self.remember(file_path, metadata)
+            return 'success'
+        return 'failed'
 
     def deploy_all(self, functions_dir: Path) -> Dict[str, int]:
         """
@@ -225,35 +599,57 @@ class OpenWebUIDeployer:
         Returns:
             Dictionary with deployment statistics
         """
-        stats = {'total': 0, 'success': 0, 'failed': 0}
+        stats = {'total': 0, 'success': 0, 'skipped': 0, 'failed': 0, 'retried': 0}
 
         self.log('Starting deployment...')
         self.log(f'OpenWebUI URL: {self.base_url}')
 
-        # Get existing functions
-        existing_functions = self.get_existing_functions()
-        self.log(f'Found {len(existing_functions)} existing functions')
+        # Get existing functions in the background while the disk is scanned
+        with ThreadPoolExecutor(max_workers=1) as prefetch:
+            existing_future = prefetch.submit(self.get_existing_functions)
+
+            # Find all Python files in functions directory
+            python_files = list(_iter_function_files(functions_dir))
 
-        # Find all Python files in functions directory
-        python_files = list(functions_dir.rglob('*.py'))
-        python_files = [f for f in python_files if not f.name.startswith('__')]
+            existing_functions = existing_future.result()
+        self.log(f'Found {len(existing_functions)} existing functions')
 
         if not python_files:
             self.log('No Python files found in functions directory', 'WARNING')
             return stats
 
+        # Skip files that have not changed since they were last deployed
+        changed_files = []
+        for file_path in python_files:
+            if self.is_unchanged(file_path, existing_functions):
+                if self.verbose:
+                    self.log(f'{file_path.name} unchanged since last deploy, skipping')
+                stats['total'] += 1
+                stats['skipped'] += 1
+            else:
+                changed_files.append(file_path)
+        python_files = changed_files
+
         self.log(f'Found {len(python_files)} function files to deploy')
 
-        # Deploy each function
-        for file_path in python_files:
+        # OpenWebUI has no bulk create/update route, so functions go one request each
+        results = self.deploy_each(python_files, existing_functions)
+
+        # Stats are only updated here, on the main thread
+        for status in results:
             stats['total'] += 1
-            if self.deploy_function(file_path, existing_functions):
-                stats['success'] += 1
-            else:
-                stats['failed'] += 1
+            stats[status] += 1
 
-        self.log('=' * 50)
-        self.log(f'Deployment complete: {stats["success"]}/{stats["total"]} successful, {stats["failed"]} failed')
+        stats['retried'] = self.retried
+        self.save_cache()
+
+        self.log(_SEP)
+        self.log(
+            f'Deployment complete: {stats["success"]}/{stats["total"]} successful, '
+            f'{stats["skipped"]} unchanged, {stats["failed"]} failed'
+        )
+        if stats['retried']:
+            self.log(f'{stats["retried"]} requests were retried after rate limiting')
 
         return stats
 
@@ -263,6 +659,9 @@ def main():
     # Get environment variables
     openwebui_url = os.getenv('OPENWEBUI_URL')
     api_key = os.getenv('OPENWEBUI_API_KEY')
+    concurrency = os.getenv('DEPLOY_CONCURRENCY', '10')
+    force = os.getenv('DEPLOY_FORCE', '') == '1'
+    verbose = os.getenv('DEPLOY_VERBOSE', '1') != '0'
 
     if not openwebui_url:
         print('ERROR: OPENWEBUI_URL environment variable is not set')
@@ -272,8 +671,18 @@ def main():
         print('ERROR: OPENWEBUI_API_KEY environment variable is not set')
         sys.exit(1)
 
+    if not (concurrency.isascii() and concurrency.isdecimal()) or int(concurrency) == 0:
+        print('ERROR: DEPLOY_CONCURRENCY must be a positive integer')
+        sys.exit(1)
+
     # Initialize deployer
-    deployer = OpenWebUIDeployer(openwebui_url, api_key)
+    deployer = OpenWebUIDeployer(
+        openwebui_url,
+        api_key,
+        max_workers=int(concurrency),
+        force=force,
+        verbose=verbose
+    )
 
     try:
         # Get functions directory